@@ -2,31 +2,82 @@
 import os
 import json
 import argparse
+import asyncio
 import base64
+import contextlib
+import hashlib
+import importlib.util
+import io
 import time
 import csv
 import re
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
+from urllib.parse import quote
+import httpx
 from dotenv import load_dotenv
-from PIL import Image
-from openai import OpenAI
+from openai import (AsyncOpenAI, RateLimitError, APITimeoutError, APIConnectionError, InternalServerError,
+                    AuthenticationError, PermissionDeniedError)
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+# orjson parses and serializes JSON several times faster; fall back to the
+# stdlib json module on platforms without orjson wheels
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# tqdm shows one progress bar for all localization requests instead of status
+# lines per request; without it a plain counter is printed
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Requests go to OpenRouter unless OPENAI_BASE_URL names another OpenAI-compatible
+# endpoint, e.g. https://api.openai.com/v1 for --batch (OpenRouter has no Files or
+# Batch API). Model IDs differ between endpoints, see MODELS below
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+API_BASE_URL = os.getenv("OPENAI_BASE_URL") or OPENROUTER_BASE_URL
+USES_OPENROUTER = API_BASE_URL.rstrip('/') == OPENROUTER_BASE_URL
+
 # Get API key from environment variable
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-if not OPENROUTER_API_KEY:
-    raise ValueError("OPENROUTER_API_KEY environment variable not set")
-
-# Initialize OpenAI client with OpenRouter base URL
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY
+API_KEY_VARIABLE = "OPENROUTER_API_KEY" if USES_OPENROUTER else "OPENAI_API_KEY"
+API_KEY = os.getenv(API_KEY_VARIABLE)
+if not API_KEY:
+    raise ValueError(f"{API_KEY_VARIABLE} environment variable not set")
+
+# Optional public URL of the images directory. When set, Vision requests reference
+# each image by URL instead of inlining the file as base64 in every request
+IMAGE_URL_BASE = os.getenv("IMAGE_URL_BASE")
+
+# Connection pool and timeouts shared by every API request
+HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=128)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# HTTP/2 multiplexes concurrent requests over a few connections; httpx only
+# supports it when the optional h2 package is installed (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Initialize a single OpenAI client for the API endpoint; its httpx pool keeps
+# connections alive so requests don't pay a new TLS handshake each time. The
+# SDK's own retries are off: tenacity retries transient errors and the request
+# processor retries rate limit errors, so retries keep honoring its cooldown
+client = AsyncOpenAI(
+    base_url=API_BASE_URL,
+    api_key=API_KEY,
+    max_retries=0,
+    timeout=HTTP_TIMEOUT,
+    http_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
 )
 
 # Define the models to use for localization - using specified model IDs
-MODELS = {
+OPENROUTER_MODELS = {
     "1-gemini flash 1.5 8B": "google/gemini-flash-1.5-8b",  # Updated based on example
     "2-gemini flash 2.0": "google/gemini-2.0-flash-001",
     "3-GPT 4-o mini": "openai/gpt-4o-mini",
@@ -35,8 +86,59 @@ MODELS = {
     "6-Grok 3": "x-ai/grok-3-beta"  # Updated based on example
 }
 
-# Vision model for image descriptions
-VISION_MODEL = "google/gemini-pro-vision"
+# Other endpoints (e.g. OpenAI for --batch) use their own unprefixed model IDs,
+# so only the OpenAI models are available there by default
+OPENAI_MODELS = {
+    "3-GPT 4-o mini": "gpt-4o-mini",
+    "4-GPT 4.1": "gpt-4.1-mini"
+}
+
+# LOCALIZATION_MODELS overrides the models as a JSON object of display name to
+# model ID, e.g. for an endpoint that serves other models
+LOCALIZATION_MODELS = os.getenv("LOCALIZATION_MODELS")
+if LOCALIZATION_MODELS:
+    MODELS = json.loads(LOCALIZATION_MODELS)
+    if not isinstance(MODELS, dict) or not MODELS:
+        raise ValueError("LOCALIZATION_MODELS must be a JSON object of display name to model ID")
+else:
+    MODELS = OPENROUTER_MODELS if USES_OPENROUTER else OPENAI_MODELS
+
+# Localization models that cannot take images as input; these get a text
+# description of the screenshot from the vision model instead
+TEXT_ONLY_MODELS = {"x-ai/grok-3-beta"}
+
+# Vision model for image descriptions, overridable with the VISION_MODEL variable
+VISION_MODEL = os.getenv("VISION_MODEL") or ("google/gemini-2.0-flash-001" if USES_OPENROUTER else "gpt-4o-mini")
+
+# Maximum number of English texts localized in a single request
+MAX_TEXTS_PER_REQUEST = 10
+
+# Polling of a submitted Batch API job starts at the minimum interval and doubles
+# up to the maximum, so small jobs finish quickly and long ones poll rarely
+BATCH_POLL_MIN_INTERVAL = 10
+BATCH_POLL_MAX_INTERVAL = 300
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Image file names: the ID with optional leading zeros (01.png), or an ID
+# embedded in a longer name and followed by a non-digit (level_3_screen.png)
+IMAGE_FILENAME_PATTERN = re.compile(r"^0*(?P<id>.+?)\.\w+$")
+IMAGE_NUMBER_PATTERN = re.compile(r"\d+(?=\D)")
+
+# Characters of a model ID replaced with '_' in output file names
+SAFE_FILENAME_TABLE = str.maketrans("/ -.", "____")
+
+# Default location of the on-disk image description cache
+DEFAULT_DESCRIPTION_CACHE = ".desc_cache.json"
+
+# Images are hashed in chunks of this size so large files never sit in memory whole
+IMAGE_HASH_CHUNK_SIZE = 64 * 1024
+
+# Inlined screenshots are downscaled to fit this many pixels per side and
+# recompressed as JPEG, which cuts upload size and vision tokens per request.
+# This needs Pillow; without it, or for files Pillow can't decode, the original
+# file is sent unchanged
+MAX_IMAGE_SIDE = 1024
+JPEG_QUALITY = 85
 
 # Define language codes for CSV columns
 LANGUAGE_CODES = {
@@ -45,23 +147,315 @@ LANGUAGE_CODES = {
     "german": "de"
 }
 
-# Create OpenAI client configured for OpenRouter
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY
+# Default rate limits for the request processor (requests/tokens per minute)
+DEFAULT_MAX_REQUESTS_PER_MINUTE = 200
+DEFAULT_MAX_TOKENS_PER_MINUTE = 400000
+
+# Default cap on in-flight row groups. The request processor enforces the rate
+# limits, so this only needs to be high enough to keep them saturated; it stays
+# below the keep-alive pool size so requests reuse connections
+DEFAULT_MAX_CONCURRENCY = 32
+
+# Retry settings for requests rejected with a rate limit error
+MAX_REQUEST_ATTEMPTS = 5
+SECONDS_TO_PAUSE_AFTER_RATE_LIMIT_ERROR = 15
+
+# Transient network and server (5xx) errors retried in place; rate limit errors
+# are retried by the request processor so they also pause other requests
+RETRYABLE_API_ERRORS = (APITimeoutError, APIConnectionError, InternalServerError)
+
+class RequestProcessorError(RuntimeError):
+    """The request processor stopped, so no queued request can complete"""
+
+# Errors that no retry can fix, such as a bad API key; these abort the run
+FATAL_API_ERRORS = (AuthenticationError, PermissionDeniedError, RequestProcessorError)
+
+# Rough token allowances used when estimating a request's cost
+IMAGE_TOKEN_ESTIMATE = 1000
+COMPLETION_TOKEN_ESTIMATE = 500
+
+@dataclass
+class StatusTracker:
+    """Track the request and token capacity available under the rate limits"""
+    max_requests_per_minute: float
+    max_tokens_per_minute: float
+    available_request_capacity: float = 0
+    available_token_capacity: float = 0
+    last_update_time: float = field(default_factory=time.monotonic)
+    time_of_last_rate_limit_error: float = 0
+    num_rate_limit_errors: int = 0
+
+    def __post_init__(self):
+        self.available_request_capacity = self.max_requests_per_minute
+        self.available_token_capacity = self.max_tokens_per_minute
+
+    def refill(self):
+        """Replenish capacity in proportion to the time elapsed since the last update"""
+        now = time.monotonic()
+        elapsed = now - self.last_update_time
+        self.available_request_capacity = min(
+            self.available_request_capacity + self.max_requests_per_minute * elapsed / 60.0,
+            self.max_requests_per_minute
+        )
+        self.available_token_capacity = min(
+            self.available_token_capacity + self.max_tokens_per_minute * elapsed / 60.0,
+            self.max_tokens_per_minute
+        )
+        self.last_update_time = now
+
+@dataclass
+class APIRequest:
+    """A chat completion request waiting for rate limit capacity"""
+    kwargs: dict
+    token_consumption: int
+    attempts_left: int
+    future: asyncio.Future
+
+def estimate_token_consumption(request_kwargs):
+    """Roughly estimate the tokens a chat completion request will consume"""
+    num_tokens = 0
+    for message in request_kwargs.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            num_tokens += len(content) // 4
+            continue
+        for part in content:
+            if part.get("type") == "text":
+                num_tokens += len(part.get("text", "")) // 4
+            else:
+                num_tokens += IMAGE_TOKEN_ESTIMATE
+    return num_tokens + request_kwargs.get("max_tokens", COMPLETION_TOKEN_ESTIMATE)
+
+@retry(
+    retry=retry_if_exception_type(RETRYABLE_API_ERRORS),
+    wait=wait_random_exponential(min=1, max=60),
+    stop=stop_after_attempt(6),
+    reraise=True
 )
+async def create_chat_completion(**kwargs):
+    """Create a chat completion, retrying transient network and server errors with backoff"""
+    return await client.chat.completions.create(**kwargs)
 
-def encode_image(image_path):
-    """Encode image to base64 for API request"""
+class APIRequestProcessor:
+    """Drip-feed chat completion requests to the API within RPM/TPM limits.
+
+    Callers await create_completion(), which enqueues the request; the run()
+    loop releases queued requests as capacity becomes available and retries
+    rate-limited requests with exponential backoff.
+    """
+
+    def __init__(self, max_requests_per_minute, max_tokens_per_minute, max_attempts=MAX_REQUEST_ATTEMPTS):
+        self.status = StatusTracker(max_requests_per_minute, max_tokens_per_minute)
+        self.max_attempts = max_attempts
+        self.queue = asyncio.Queue()
+        self.error = None
+        self._in_flight = set()
+
+    async def create_completion(self, **kwargs):
+        """Queue a chat completion request and wait for its result"""
+        if self.error:
+            raise self.error
+        future = asyncio.get_running_loop().create_future()
+        token_consumption = min(estimate_token_consumption(kwargs), self.status.max_tokens_per_minute)
+        await self.queue.put(APIRequest(kwargs, token_consumption, self.max_attempts, future))
+        return await future
+
+    async def run(self):
+        """Release queued requests as rate limit capacity allows"""
+        request = None
+        try:
+            while True:
+                request = await self.queue.get()
+                await self._wait_for_capacity(request.token_consumption)
+                self.status.available_request_capacity -= 1
+                self.status.available_token_capacity -= request.token_consumption
+                task = asyncio.create_task(self._call_api(request))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+                request = None
+        except Exception as e:
+            # Fail the waiting callers instead of leaving them to wait forever
+            self.error = RequestProcessorError(f"Request processor stopped: {type(e).__name__}: {str(e)}")
+            self.error.__cause__ = e
+            pending = [request] if request else []
+            while not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+            for pending_request in pending:
+                if not pending_request.future.done():
+                    pending_request.future.set_exception(self.error)
+
+    def cancel_in_flight(self):
+        """Cancel the requests already sent to the API and return their tasks"""
+        tasks = list(self._in_flight)
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    async def _wait_for_capacity(self, token_consumption):
+        while True:
+            self.status.refill()
+            # Pause everything for a while after the API reports a rate limit error
+            cooldown = (self.status.time_of_last_rate_limit_error
+                        + SECONDS_TO_PAUSE_AFTER_RATE_LIMIT_ERROR - time.monotonic())
+            if cooldown > 0:
+                await asyncio.sleep(cooldown)
+                continue
+            request_deficit = 1 - self.status.available_request_capacity
+            token_deficit = token_consumption - self.status.available_token_capacity
+            if request_deficit <= 0 and token_deficit <= 0:
+                return
+            await asyncio.sleep(max(
+                request_deficit * 60.0 / self.status.max_requests_per_minute,
+                token_deficit * 60.0 / self.status.max_tokens_per_minute
+            ))
+
+    async def _call_api(self, request):
+        try:
+            completion = await create_chat_completion(**request.kwargs)
+        except RateLimitError as e:
+            self.status.num_rate_limit_errors += 1
+            self.status.time_of_last_rate_limit_error = time.monotonic()
+            request.attempts_left -= 1
+            if request.attempts_left <= 0:
+                request.future.set_exception(e)
+                return
+            attempt = self.max_attempts - request.attempts_left
+            print_status(f"⚠️ Rate limited by the API, retrying in {2 ** attempt}s "
+                         f"({request.attempts_left} attempts left)")
+            await asyncio.sleep(2 ** attempt)
+            if self.error:
+                request.future.set_exception(self.error)
+            else:
+                await self.queue.put(request)
+        except Exception as e:
+            request.future.set_exception(e)
+        else:
+            request.future.set_result(completion)
+
+@lru_cache(maxsize=256)
+def _encode_image_file(image_path, mtime_ns, size):
+    try:
+        # Imported here so runs that never inline an image don't pay for loading Pillow
+        from PIL import Image
+        
+        with Image.open(image_path) as image:
+            image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
+    except (ImportError, OSError):
+        # UnidentifiedImageError and truncated files are OSErrors
+        pass
+    
     with open(image_path, "rb") as image_file:
         return f"data:image/png;base64,{base64.b64encode(image_file.read()).decode('utf-8')}"
 
-def get_image_dimensions(image_path):
-    """Get dimensions of the image"""
-    with Image.open(image_path) as img:
-        return img.size
+@lru_cache(maxsize=1024)
+def _hash_image_file(image_path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(IMAGE_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def encode_image(image_path):
+    """Encode image to base64 for API request, reusing the result until the file changes"""
+    stat = os.stat(image_path)
+    return _encode_image_file(image_path, stat.st_mtime_ns, stat.st_size)
+
+def print_status(message):
+    """Print a status line without breaking the progress bar, if one is shown"""
+    if tqdm:
+        tqdm.write(message)
+    else:
+        print(message)
+
+def json_loads(data):
+    """Parse a JSON document, using orjson when available"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize an object as UTF-8 encoded JSON, optionally indented by 2 spaces"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
 
-def get_image_path(imgs_dir, image_id):
+def json_dumps_line(obj):
+    """Serialize an object as one UTF-8 encoded JSON Lines record"""
+    if orjson:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode('utf-8')
+
+def get_image_url(image_path):
+    """Get the URL to send for an image: its hosted copy if configured, else a base64 data URL"""
+    if IMAGE_URL_BASE:
+        return f"{IMAGE_URL_BASE.rstrip('/')}/{quote(os.path.basename(image_path))}"
+    return encode_image(image_path)
+
+def get_image_hash(image_path):
+    """Hash the image contents so cached descriptions survive file renames"""
+    stat = os.stat(image_path)
+    return _hash_image_file(image_path, stat.st_mtime_ns, stat.st_size)
+
+# Image reads (hashing or encoding) currently running in a worker thread
+_pending_image_reads = {}
+
+async def read_image_in_thread(read_func, image_path):
+    """Run a blocking image read such as get_image_hash off the event loop.
+
+    Concurrent calls for the same image share one worker thread; once it is
+    done, repeated calls are served by the read function's own cache.
+    """
+    key = (read_func, image_path)
+    task = _pending_image_reads.get(key)
+    if task is None:
+        task = _pending_image_reads[key] = asyncio.ensure_future(asyncio.to_thread(read_func, image_path))
+        task.add_done_callback(lambda _: _pending_image_reads.pop(key, None))
+    return await task
+
+def load_description_cache(cache_path):
+    """Load cached image descriptions (image hash -> description) from disk"""
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'rb') as f:
+            return json_loads(f.read())
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable description cache {cache_path}: {str(e)}")
+        return {}
+
+def save_description_cache(cache, cache_path):
+    """Atomically write cached image descriptions to disk"""
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(json_dumps(cache))
+    os.replace(tmp_path, cache_path)
+
+def build_image_index(imgs_dir):
+    """Scan the images directory once and map image IDs to file paths"""
+    exact_paths = {}
+    fallback_paths = {}
+    with os.scandir(imgs_dir) as entries:
+        for entry in entries:
+            # Skip subdirectories; is_file() uses the scandir entry type without a stat call
+            if not entry.is_file():
+                continue
+            
+            # Files named like 1.png, 01.png, or similar
+            match = IMAGE_FILENAME_PATTERN.match(entry.name)
+            if match:
+                exact_paths.setdefault(match.group('id'), entry.path)
+            
+            # Other common patterns, e.g. level_3_screen.png
+            for number in IMAGE_NUMBER_PATTERN.findall(entry.name):
+                fallback_paths.setdefault(number.lstrip('0') or '0', entry.path)
+    
+    # Exact file name matches take precedence over the fallback patterns
+    return {**fallback_paths, **exact_paths}
+
+def get_image_path(image_index, image_id):
     """Get the path to an image based on its ID"""
     if not image_id:
         return None
@@ -70,32 +464,25 @@ def get_image_path(imgs_dir, image_id):
     image_id = str(image_id).strip()
     if not image_id:
         return None
-        
-    # Look for files with patterns like 1.png, 01.png, or similar
-    pattern = re.compile(r"^0*" + image_id + r"\.\w+$")
-    
-    for filename in os.listdir(imgs_dir):
-        if pattern.match(filename):
-            return os.path.join(imgs_dir, filename)
     
-    # If no specific match found, try other common patterns
-    pattern = re.compile(r".*?" + image_id + r"[^0-9].*")
-    for filename in os.listdir(imgs_dir):
-        if pattern.match(filename):
-            return os.path.join(imgs_dir, filename)
-    
-    return None
+    return image_index.get(image_id.lstrip('0') or '0')
 
-def get_image_description(image_path, debug=False):
+async def get_image_description(image_path, processor, disk_cache, debug=False):
     """Get description of image using Gemini Pro Vision"""
-    print(f"\n🔍 Getting image description for {os.path.basename(image_path)}...")
+    print_status(f"\n🔍 Getting image description for {os.path.basename(image_path)}...")
     
     if debug:
-        print("  DEBUG MODE: Returning mock description instead of calling API")
+        print_status("  DEBUG MODE: Returning mock description instead of calling API")
         return f"This is a debug description for image {os.path.basename(image_path)}"
     
-    # Encode image to base64
-    image_url = encode_image(image_path)
+    # Reuse a description generated by an earlier run for the same image
+    image_hash = await read_image_in_thread(get_image_hash, image_path)
+    if image_hash in disk_cache:
+        print_status("✓ Using cached image description")
+        return disk_cache[image_hash]
+    
+    # Reference the hosted image, or encode it to base64
+    image_url = await read_image_in_thread(get_image_url, image_path)
     
     system_prompt = """
     You are a detailed image description expert.
@@ -114,7 +501,7 @@ def get_image_description(image_path, debug=False):
     
     try:
         # Create request using OpenAI client for OpenRouter
-        completion = client.chat.completions.create(
+        completion = await processor.create_completion(
             extra_headers={
                 "HTTP-Referer": "https://cascade.ai",  # Site URL for rankings
                 "X-Title": "Game Localization Tool",   # Site title for rankings
@@ -130,82 +517,31 @@ def get_image_description(image_path, debug=False):
         
         # Extract description
         description = completion.choices[0].message.content
+        disk_cache[image_hash] = description
         
-        print("✓ Successfully obtained image description")
+        print_status("✓ Successfully obtained image description")
         return description
         
+    except FATAL_API_ERRORS:
+        raise
     except Exception as e:
-        print(f"✗ Error getting image description: {str(e)}")
+        print_status(f"✗ Error getting image description: {str(e)}")
         return "Error: Could not generate image description"
 
-def process_localization(description, english_text, model_id, model_name, debug=False):
-    """Process localization using a specific model"""
-    print(f"\n🔄 Processing localization with model: {model_id}")
-    
-    if debug:
-        print("  DEBUG MODE: Returning mock translations instead of calling API")
-        return {
-            "localization": {
-                "turkish": f"[TR] {english_text}",
-                "french": f"[FR] {english_text}",
-                "german": f"[DE] {english_text}"
-            }
+def error_localizations(english_texts, message):
+    """Build placeholder localizations that flag a failed request"""
+    return [
+        {
+            "turkish": f"[ERROR: {message}] {english_text}",
+            "french": f"[ERROR: {message}] {english_text}",
+            "german": f"[ERROR: {message}] {english_text}"
         }
-    
-    # Context prompt explaining what we want
-    system_prompt = f"""
-    You are a game localization translator expert.
-
-    You have been provided with an image description and English text from a 'Brain Test' puzzle game.
-    You can use the following information for localization:
-        
-        You're localizing a 'Brain Test' named children's brain teaser game that uses word play, 
-        Brain Test is childen's brain teaser game that is popular worldwide, known for its tricky and often unexpected brain teasers designed to challenge players' logic and intelligence. 
-        Emphasizing that appearances can be deceiving, the game encourages players to think outside the box while offering a hint system for help. 
-        Developed by Unico Studio, Brain Test games aim to capture the atmosphere loved by players and offer an addictive, free and family-friendly experience that can be enjoyed offline as a relaxing brain workout.
-        
-        also you can use the following information for localization:
-        
-        1. The game is a children's brain teaser game that uses word play.
-        2. The game is popular worldwide, known for its tricky and often unexpected brain teasers designed to challenge players' logic and intelligence.
-        3. The game encourages players to think outside the box while offering a hint system for help.
-        4. The game is developed by Unico Studio.
-        5. The game is free and family-friendly.
-        6. The game is offline and can be enjoyed as a relaxing brain workout.
-        7. The game is a children's brain teaser game that uses word play.
-        
-        more information about the game:
-        
-        https://play.google.com/store/apps/details?id=com.unicostudio.braintest&hl=tr
-    Image Description:
-    {description}
-    
-    Your task is to provide culturally-appropriate localizations of the English text in:
-    Turkish, French, and German. For localization, use cultural references, idioms, and wordplay specific to each language. Do NOT provide direct translations.
-    Examine the game screenshot and the corresponding English text carefully. 
-    
-    These should preserve the game mechanics, humor, and puzzle elements but adapt them to feel natural 
-    in each target language. Use cultural references, idioms, and wordplay specific to each language.
-
-    For best localization results, use the following approach:
-    - Use idioms and expressions that are common in the target language
-    - Use cultural references that are relevant to the target language
-    - Use humor that is appropriate for the target language
-    - If you need more specific details, use the description to guide your localization.
-
-    Localization results should not be too long, close to the length of the English input.
-    The number of input sentences must be the same as the number of output sentences.
+        for english_text in english_texts
+    ]
 
-    Do not use all the content written in the description in exactly the same way. 
-    Description only may help you for localization.
-
-    Localization results should not be too long, close to the length of the English input.
-    The number of input sentences must be the same as the number of output sentences
-    For example, if the English text is 1 sentence, the localization output should be 1 sentence. do not output very long texts 
-    
-    Example localization for you:
-    
-    English text :	Some parts of the board are covered.	localizated in turkish :	Tahtanın bir kısmı görünmüyor.	localized in german :	Einige Teile der Tafel sind verdeckt.	localizated in french :	Certaines parties du tableau sont cachées.
+# Example localizations from the game, one line per English text
+FEWSHOT_EXAMPLES = """
+English text :	Some parts of the board are covered.	localizated in turkish :	Tahtanın bir kısmı görünmüyor.	localized in german :	Einige Teile der Tafel sind verdeckt.	localizated in french :	Certaines parties du tableau sont cachées.
 English text :	Drag the curtain above to reveal what is x.	localizated in turkish :	Perdeyi kaldırıp x'i görebilirsin.	localized in german :	Zieh den Vorhang hoch, um das x zu zeigen.	localizated in french :	Remontez le store pour découvrir la valeur de x.
 English text :	Are you insulting me with this easy question?!	localizated in turkish :	Böyle basit bir soruyla dalga mı geçiyorsun benimle?!	localized in german :	Willst du mich mit dieser trivialen Frage beleidigen?	localizated in french :	C’est tellement facile que je suis vexée !
 English text :	I just wanted to make sure that you know basic math.	localizated in turkish :	Kızma ya! Önce bi matematik temelini ölçmek istedim.	localized in german :	Ich wollte nur sicherstellen, dass du Grundlagenmathe kannst.	localizated in french :	Je voulais vérifier si tu avais les bases en maths.
@@ -213,7 +549,7 @@ English text :	Doctor Worry must get some venom for his new medicine.	localizate
 English text :	The snake spits venom if a prey approaches it.	localizated in turkish :	Yılana yiyecek yaklaştırırsan zehrini salgılar.	localized in german :	Die Schlange spuckt Gift, wenn sich eine Beute nähert.	localizated in french :	Le serpent crache du venin quand une proie s’en approche.
 English text :	Drag the mouse close to the snake.	localizated in turkish :	Fareyi yılana yaklaştır.	localized in german :	Ziehe die Maus nah an die Schlange heran.	localizated in french :	Amenez la souris près du serpent.
 English text :	Drag the empty bottle to collect the venom.	localizated in turkish :	Boş şişeyle yere dökülen zehri topla.	localized in german :	Ziehe dir leere Flasche, um das Gift zu sammeln.	localizated in french :	Utilisez la fiole vide pour prendre du venin.
-English text :	I will use this venom to make a medicine to cure the Kardashian fans.	localizated in turkish :	Bu zehri kullanarak yapacağım ilaç ile halkımızı Müge Anlı izleme hastalığından kurtaracağım!	localized in german :	Ich werde dieses Gift verwenden, um eine Medizin zu erschaffen, welche die Helene Fischer-Fans heilen soll.	localizated in french :	Je vais préparer un traitement pour soigner les fans des Marseillais ! 
+English text :	I will use this venom to make a medicine to cure the Kardashian fans.	localizated in turkish :	Bu zehri kullanarak yapacağım ilaç ile halkımızı Müge Anlı izleme hastalığından kurtaracağım!	localized in german :	Ich werde dieses Gift verwenden, um eine Medizin zu erschaffen, welche die Helene Fischer-Fans heilen soll.	localizated in french :	Je vais préparer un traitement pour soigner les fans des Marseillais !
 English text :	This man wants some hair.	localizated in turkish :	Adam başında saç istiyor.	localized in german :	Dieser Mann will Haar.	localizated in french :	Il rêve d’avoir des cheveux.
 English text :	Drag some seeds on top of his head.	localizated in turkish :	Tohumları kafasına ek.	localized in german :	Ziehe Samen auf seinen Kopf.	localizated in french :	Mettez des graines sur sa tête.
 English text :	Water it after putting the seeds.	localizated in turkish :	Tohumları koyduktan sora başını sula.	localized in german :	Gieße sie nachdem du die Samen hingezogen hast.	localizated in french :	Arrosez les graines.
@@ -256,201 +592,456 @@ English text :	There is dirt on the right.	localizated in turkish :	Sağ tarafta
 English text :	Drag the screen to see the dirt.	localizated in turkish :	Ekranı kaydırıp toprağı gör.	localized in german :	Ziehe den Bildschirm, um die Erde zu sehen.	localizated in french :	Faites glisser l’écran pour voir la terre.
 English text :	Put away her socks and drag her on to the dirt.	localizated in turkish :	Çoraplarını çıkar ve toprağa sürükle.	localized in german :	Mache sie barfuß und ziehe sie zur Erde.	localizated in french :	Retirez ses chaussures et chaussettes, et mettez-la sur la terre.
 English text :	Easy for Lily! Where can you find some dirt to get onto these days?!	localizated in turkish :	Bediş'e kolay tabi! Biz bu devirde böyle toprağı nerede bulalım?! Her yer beton!	localized in german :	Wo kann man sonst heutzutage noch Erde finden? Alles nur noch Beton!	localizated in french :	Pauvre Lily ! C’est de plus en plus dur de se reconnecter à la nature !
+""".strip().splitlines()
+
+# Number of examples included in the system prompt; lower it (or set 0) via the
+# environment to trade some localization quality for fewer input tokens
+FEWSHOT_EXAMPLE_COUNT = int(os.getenv("FEWSHOT_EXAMPLE_COUNT", len(FEWSHOT_EXAMPLES)))
+
+# Static system prompt shared by every localization request. Per-request data
+# (screenshot or description, English texts) goes in the user message so this
+# prefix stays identical across calls and can be cached by the provider.
+# Examples are always the first FEWSHOT_EXAMPLE_COUNT, never a random sample,
+# so the prefix does not change between runs
+SYSTEM_PROMPT_STATIC = """
+    You are a game localization translator expert.
+
+    You have been provided with a game screenshot or its description, and English text from a 'Brain Test' puzzle game.
+    You can use the following information about the game for localization:
+    - Brain Test is a children's brain teaser game that uses word play. It is popular worldwide, known for its tricky and often unexpected brain teasers designed to challenge players' logic and intelligence.
+    - Emphasizing that appearances can be deceiving, the game encourages players to think outside the box while offering a hint system for help.
+    - Developed by Unico Studio, it is a free and family-friendly game that can be enjoyed offline as a relaxing brain workout.
+    - More information: https://play.google.com/store/apps/details?id=com.unicostudio.braintest&hl=tr
+
+    Your task is to provide culturally-appropriate localizations of the English text in Turkish, French, and German. Do NOT provide direct translations.
+    Examine the game screenshot or description and the corresponding English text carefully.
+    You will receive one or more numbered English texts that all belong to the same game screen.
+    Localize each text on its own and return the localizations in the same order as the texts.
+
+    The localizations should preserve the game mechanics, humor, and puzzle elements but feel natural in each target language:
+    - Use idioms, expressions, cultural references, and wordplay specific to the target language
+    - Use humor that is appropriate for the target language
+    - Use the screenshot or description only as a guide for specific details; do not copy its content into the localization
+
+    Keep each localization close to the length of its English text, with the same number of sentences.
+    For example, if the English text is 1 sentence, the localization output should be 1 sentence.
+""" + ("""
+    Example localizations:
+
+""" + "\n".join(FEWSHOT_EXAMPLES[:FEWSHOT_EXAMPLE_COUNT]) + "\n" if FEWSHOT_EXAMPLE_COUNT > 0 else "") + """
+    Format your response exactly as a valid JSON object with one entry per English text, in order:
+    {
+        "localizations": [
+            {
+                "turkish": "Turkish localization...",
+                "french": "French localization...",
+                "german": "German localization..."
+            }
+        ]
+    }
+    """
+
+# OpenRouter model ID prefixes whose providers support explicit prompt caching
+# breakpoints; other endpoints reject the cache_control field
+PROMPT_CACHE_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+def build_system_message(model_name):
+    """Build the system message, marking it cacheable where the provider supports it"""
+    if USES_OPENROUTER and model_name.startswith(PROMPT_CACHE_MODEL_PREFIXES):
+        return {
+            "role": "system",
+            "content": [
+                {"type": "text", "text": SYSTEM_PROMPT_STATIC, "cache_control": {"type": "ephemeral"}}
+            ]
+        }
+    return {"role": "system", "content": SYSTEM_PROMPT_STATIC}
+
+def build_localization_request(description, english_texts, model_name, image_url=None):
+    """Build the chat completion request body for localizing English texts.
+
+    With an image_url the screenshot itself goes in the user message; otherwise
+    the image description does.
+    """
+    # Number the texts so the model can answer them one by one
+    numbered_texts = "\n".join(f"{n}. {english_text}" for n, english_text in enumerate(english_texts, 1))
+    
+    if image_url:
+        user_content = [
+            {"type": "image_url", "image_url": {"url": image_url}},
+            {"type": "text", "text": f"English texts:\n{numbered_texts}"}
+        ]
+    else:
+        user_content = f"Image Description:\n{description}\n\nEnglish texts:\n{numbered_texts}"
+    
+    return {
+        "model": model_name,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            build_system_message(model_name),
+            {"role": "user", "content": user_content}
+        ]
+    }
+
+def parse_localization_response(response_text, english_texts, model_id):
+    """Parse a model response into one localization dict per English text"""
+    # Providers return no content e.g. when a response is filtered
+    if response_text is None:
+        print_status(f"✗ Empty response from model {model_id}")
+        return error_localizations(english_texts, "Empty response")
+    
+    # Parse JSON response
+    try:
+        result = json_loads(response_text)
+        
+        # Validate that the result contains the expected keys
+        localizations = result.get('localizations') if isinstance(result, dict) else None
+        if not isinstance(localizations, list):
+            print_status(f"⚠️ Response JSON doesn't contain a 'localizations' list: {result}")
+            return error_localizations(english_texts, "Missing localization data")
+        
+        if len(localizations) != len(english_texts):
+            print_status(f"⚠️ Response has {len(localizations)} localizations for {len(english_texts)} texts")
+        
+        # Check that every text got all languages
+        missing_langs = set()
+        for n, english_text in enumerate(english_texts):
+            if n >= len(localizations) or not isinstance(localizations[n], dict):
+                localizations[n:n + 1] = error_localizations([english_text], "Missing localization")
+                continue
+            for lang in ['turkish', 'french', 'german']:
+                if lang not in localizations[n]:
+                    missing_langs.add(lang)
+                    localizations[n][lang] = f"[ERROR: Missing {lang} translation] {english_text}"
+        
+        if missing_langs:
+            print_status(f"⚠️ Response missing translations for: {', '.join(sorted(missing_langs))}")
+        
+        return localizations[:len(english_texts)]
+        
+    except json.JSONDecodeError as json_err:
+        print_status(f"✗ Error parsing JSON from model {model_id}: {str(json_err)}")
+        print_status(f"Response text: {response_text[:200]}...")
+        return error_localizations(english_texts, "Invalid JSON")
 
-    Format your response exactly as a valid JSON object with this structure:
-    {{
-        "localization": {{
-            "turkish": "Turkish localization...",
-            "french": "French localization...",
-            "german": "German localization..."
-        }}
-    }}
+async def process_localization(description, english_texts, model_id, model_name, processor, image_url=None,
+                               debug=False):
+    """Localize a list of English texts that share an image with a specific model.
+
+    The model sees the image itself when image_url is given, else its description.
+    Returns one {"turkish", "french", "german"} dict per input text, in order.
     """
+    if debug:
+        print_status(f"\n🔄 Processing localization of {len(english_texts)} texts with model: {model_id}")
+        print_status("  DEBUG MODE: Returning mock translations instead of calling API")
+        return [
+            {
+                "turkish": f"[TR] {english_text}",
+                "french": f"[FR] {english_text}",
+                "german": f"[DE] {english_text}"
+            }
+            for english_text in english_texts
+        ]
     
     try:
         # Create request using OpenAI client for OpenRouter
-        print(f"  Sending request to model: {model_name}")
-        completion = client.chat.completions.create(
+        completion = await processor.create_completion(
             extra_headers={
                 "HTTP-Referer": "https://cascade.ai",  # Site URL for rankings
                 "X-Title": "Game Localization Tool",   # Site title for rankings
             },
-            model=model_name,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"English text: {english_text}"}
-            ],
-            timeout=60  # Add timeout to prevent hanging requests
+            **build_localization_request(description, english_texts, model_name, image_url=image_url)
         )
         
         # Extract response text
         response_text = completion.choices[0].message.content
+        return parse_localization_response(response_text, english_texts, model_id)
         
-        # Parse JSON response
-        try:
-            result = json.loads(response_text)
-            
-            # Validate that the result contains the expected keys
-            if 'localization' not in result:
-                print(f"⚠️ Response JSON doesn't contain 'localization' key: {result}")
-                return {
-                    "localization": {
-                        "turkish": f"[ERROR: Missing localization data] {english_text}",
-                        "french": f"[ERROR: Missing localization data] {english_text}",
-                        "german": f"[ERROR: Missing localization data] {english_text}"
-                    }
-                }
-            
-            # Check if all languages are included
-            missing_langs = []
-            for lang in ['turkish', 'french', 'german']:
-                if lang not in result['localization']:
-                    missing_langs.append(lang)
-                    result['localization'][lang] = f"[ERROR: Missing {lang} translation] {english_text}"
-            
-            if missing_langs:
-                print(f"⚠️ Response missing translations for: {', '.join(missing_langs)}")
-                
-            print(f"✓ Successfully processed localization with model {model_id}")
-            return result
-            
-        except json.JSONDecodeError as json_err:
-            print(f"✗ Error parsing JSON from model {model_id}: {str(json_err)}")
-            print(f"Response text: {response_text[:200]}...")
-            return {
-                "localization": {
-                    "turkish": f"[ERROR: Invalid JSON] {english_text}",
-                    "french": f"[ERROR: Invalid JSON] {english_text}",
-                    "german": f"[ERROR: Invalid JSON] {english_text}"
-                }
-            }
-        
+    except FATAL_API_ERRORS:
+        raise
     except Exception as e:
-        print(f"✗ Error processing localization with model {model_id}: {str(e)}")
-        return {
-            "localization": {
-                "turkish": f"[ERROR: {str(e)}] {english_text}",
-                "french": f"[ERROR: {str(e)}] {english_text}",
-                "german": f"[ERROR: {str(e)}] {english_text}"
-            }
-        }
+        print_status(f"✗ Error processing localization with model {model_id}: {str(e)}")
+        return error_localizations(english_texts, str(e))
 
-def read_semicolon_csv(csv_file):
-    """Read a CSV file with semicolons as separators"""
-    rows = []
+def read_semicolon_csv(csv_file, limit=None):
+    """Read a CSV file with semicolons as separators, stopping after limit rows if given"""
     headers = ["KEY", "LEVEL_ID", "Text_ID", "image_id", "en", "tr", "de", "fr"]
     
-    with open(csv_file, 'r', encoding='utf-8') as file:
-        # Skip BOM if present
-        content = file.read()
-        if content.startswith('\ufeff'):
-            content = content[1:]
-            
-    lines = content.split('\n')
-    
-    # Skip header line
-    for line in lines[1:]:
-        if not line.strip():  # Skip empty lines
-            continue
-            
-        # Split by semicolon
-        values = line.split(';')
+    # utf-8-sig skips the BOM if present
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as file:
+        reader = csv.reader(file, delimiter=';')
+        
+        # Skip header line
+        next(reader, None)
         
-        if len(values) >= len(headers):
-            row = {}
-            for i, header in enumerate(headers):
-                row[header] = values[i] if i < len(values) else ""
-            rows.append(row)
+        # Keep only rows with every column; extra trailing columns are dropped
+        rows = list(islice((dict(zip(headers, row)) for row in reader if len(row) >= len(headers)), limit))
     
     return headers, rows
 
-def process_row(row, imgs_dir, descriptions_cache, model_id, model_name, debug=False):
-    """Process a single row from the CSV file"""
-    # Extract the necessary information
-    image_id = row.get('image_id', '').strip() if row.get('image_id') else ''
-    english_text = row.get('en', '').strip() if row.get('en') else ''
-    key = row.get('KEY', '').strip() if row.get('KEY') else ''
-    level_id = row.get('LEVEL_ID', '').strip() if row.get('LEVEL_ID') else ''
-    text_id = row.get('Text_ID', '').strip() if row.get('Text_ID') else ''
-    
-    # Skip rows without image_id or English text
-    if not image_id or not english_text:
-        print(f"\n⚠️ Skipping row with KEY={key}: Missing image_id or English text")
-        return row, None
-    
-    print(f"\n🔄 Processing {key} for Level {level_id}, Text {text_id}, Image {image_id}")
-    
-    # Get or generate image description
-    if image_id in descriptions_cache:
-        description = descriptions_cache[image_id]
-    else:
-        # Find the image file
-        image_path = get_image_path(imgs_dir, image_id)
-        if not image_path:
-            print(f"⚠️ Image not found for image_id={image_id}")
-            return row, None
-        
-        # Get the description
-        description = get_image_description(image_path, debug=debug)
-        descriptions_cache[image_id] = description
+async def get_group_image_context(image_id, model_name, image_index, descriptions_cache, disk_cache, processor,
+                                  debug=False):
+    """Get what a localization request needs to know about a row group's image.
+
+    Returns (image_url, description), or None if the image is missing. Multimodal
+    models get the image itself; text-only models get a Vision model description.
+    """
+    # Find the image file
+    image_path = get_image_path(image_index, image_id)
+    if not image_path:
+        print_status(f"⚠️ Image not found for image_id={image_id}")
+        return None
+    
+    if debug and model_name not in TEXT_ONLY_MODELS:
+        # Mock localizations never look at the image, so skip hashing and encoding it
+        return None, None
+    
+    if model_name not in TEXT_ONLY_MODELS:
+        # No Vision call needed; a description cached by an earlier run is still
+        # reported in the JSON output
+        image_url, image_hash = await asyncio.gather(read_image_in_thread(get_image_url, image_path),
+                                                     read_image_in_thread(get_image_hash, image_path))
+        return image_url, disk_cache.get(image_hash)
+    
+    # The cache holds one task per image, started by start_image_descriptions, so
+    # every text-only model waits on a single Vision API call
+    return None, await descriptions_cache[image_id]
+
+def start_image_descriptions(image_ids, image_index, descriptions_cache, disk_cache, processor, max_concurrency,
+                             debug=False):
+    """Start one Vision description task per unique image, ahead of the localization requests.
+
+    At most max_concurrency descriptions run at once, so only that many inlined
+    images are held in memory and waiting in the rate limiter at a time; the
+    localization requests of multimodal models are queued alongside them.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def describe_bounded(image_path):
+        async with semaphore:
+            return await get_image_description(image_path, processor, disk_cache, debug=debug)
+    
+    for image_id in dict.fromkeys(image_ids):
+        image_path = get_image_path(image_index, image_id)
+        if image_path and image_id not in descriptions_cache:
+            descriptions_cache[image_id] = asyncio.ensure_future(describe_bounded(image_path))
+
+def apply_localizations(indices, results, translations):
+    """Store localization results as the language columns of the rows at indices.
+
+    translations maps a row index to its localized columns, so the input rows
+    stay shared and unchanged across models.
+    """
+    for i, localizations in zip(indices, results):
+        translations[i] = {
+            lang_code: localizations[lang_name]
+            for lang_name, lang_code in LANGUAGE_CODES.items() if lang_name in localizations
+        }
+
+async def process_row_group(rows, indices, translations, image_id, image_index, descriptions_cache, disk_cache,
+                            model_id, model_name, processor, debug=False):
+    """Process the CSV rows at indices, which share an image, with a single localization request.
+
+    Returns the (image_url, description) context used, or None if the rows were skipped.
+    """
+    rows = [rows[i] for i in indices]
+    if debug:
+        keys = ', '.join(row.get('KEY', '').strip() for row in rows)
+        print_status(f"\n🔄 Processing {keys} for Image {image_id}")
+    
+    # Get the image, or its description for text-only models
+    context = await get_group_image_context(image_id, model_name, image_index, descriptions_cache, disk_cache,
+                                            processor, debug=debug)
+    if context is None:
+        return None
+    image_url, description = context
     
     # Process localization
-    result = process_localization(description, english_text, model_id, model_name, debug=debug)
+    english_texts = [row['en'].strip() for row in rows]
+    results = await process_localization(description, english_texts, model_id, model_name, processor,
+                                         image_url=image_url, debug=debug)
+    apply_localizations(indices, results, translations)
+    
+    return context
+
+async def run_batch(requests_path):
+    """Run a JSONL file of chat completion requests through the Batch API.
+
+    Returns a dict mapping each custom_id to the response message content;
+    failed requests are left out.
+    """
+    with open(requests_path, 'rb') as f:
+        batch_file = await client.files.create(file=f, purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"  Submitted batch {batch.id}")
+    
+    poll_interval = BATCH_POLL_MIN_INTERVAL
+    while batch.status not in BATCH_FINAL_STATUSES:
+        await asyncio.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, BATCH_POLL_MAX_INTERVAL)
+        batch = await client.batches.retrieve(batch.id)
+        print(f"  Batch {batch.id} status: {batch.status}")
     
-    # Update the row with localization results
-    localizations = result.get('localization', {})
-    for lang_name, lang_code in LANGUAGE_CODES.items():
-        if lang_name in localizations:
-            row[lang_code] = localizations[lang_name]
+    # Requests that failed outright are reported in a separate error file
+    if batch.error_file_id:
+        errors = await client.files.content(batch.error_file_id)
+        for line in errors.text.splitlines():
+            if line.strip():
+                record = json_loads(line)
+                print(f"⚠️ Batch request {record.get('custom_id')} failed: {record.get('error')}")
     
-    return row, description
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} finished with status {batch.status}")
+    
+    # Collect the successful responses by custom_id
+    responses = {}
+    content = await client.files.content(batch.output_file_id)
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        record = json_loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") == 200:
+            responses[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        else:
+            print(f"⚠️ Batch request {record.get('custom_id')} failed: "
+                  f"{record.get('error') or response.get('status_code')}")
+    return responses
 
-def write_semicolon_csv(rows, headers, output_file):
-    """Write rows to a CSV file with semicolons as separators using UTF-8 encoding.
-    Special focus on ensuring Turkish characters are properly handled.
+async def process_row_groups_batch(row_groups, rows, translations, image_index, descriptions_cache, disk_cache,
+                                   model_id, model_name, processor, requests_path, debug=False):
+    """Localize all row groups for one model through the Batch API into translations.
+
+    Returns the (image_url, description) context of each row group, or None
+    where the group was skipped.
     """
-    # Explicitly use utf-8-sig to include BOM (Byte Order Mark) for better compatibility
-    with open(output_file, 'w', encoding='utf-8-sig', newline='') as file:
-        # Write headers with BOM to ensure encoding is recognized
-        header_line = ';'.join(headers) + '\n'
-        file.write(header_line)
-        
-        # For each row, ensure proper encoding especially for Turkish characters
-        for row in rows:
-            # Turkish characters that need special attention: ı, İ, ğ, Ğ, ü, Ü, ş, Ş, ç, Ç, ö, Ö
-            values = []
-            for header in headers:
-                value = row.get(header, '')
-                if value is None:
-                    value = ''
-                # Ensure proper string representation with Turkish characters
-                if isinstance(value, str):
-                    # Already a string, just use as is (will be encoded as UTF-8-sig)
-                    values.append(value)
-                else:
-                    # Convert to string
-                    values.append(str(value))
-            
-            # Join with semicolons and write to file
-            line = ';'.join(values) + '\n'
-            file.write(line)
+    # Descriptions for text-only models still come from the live Vision API
+    contexts = await asyncio.gather(*(
+        get_group_image_context(image_id, model_name, image_index, descriptions_cache, disk_cache, processor,
+                                debug=debug)
+        for image_id, indices in row_groups
+    ), return_exceptions=True)
+    
+    # A group whose image can't be read is skipped like in live mode, not the whole batch
+    for g, ((image_id, indices), context) in enumerate(zip(row_groups, contexts)):
+        if isinstance(context, BaseException):
+            if isinstance(context, FATAL_API_ERRORS) or not isinstance(context, Exception):
+                raise context
+            print(f"✗ Error processing rows for image {image_id} with model {model_id}: "
+                  f"{type(context).__name__}: {str(context)}")
+            contexts[g] = None
+    
+    if debug:
+        print("  DEBUG MODE: Skipping the Batch API")
+        for (image_id, indices), context in zip(row_groups, contexts):
+            if context is not None:
+                english_texts = [rows[i]['en'].strip() for i in indices]
+                results = await process_localization(context[1], english_texts, model_id, model_name, processor,
+                                                     image_url=context[0], debug=debug)
+                apply_localizations(indices, results, translations)
+        return contexts
+    
+    # Write one request line per row group, identified by its position and image
+    with open(requests_path, 'wb') as f:
+        for g, ((image_id, indices), context) in enumerate(zip(row_groups, contexts)):
+            if context is None:
+                continue
+            image_url, description = context
+            english_texts = [rows[i]['en'].strip() for i in indices]
+            request = {
+                "custom_id": f"{g}:{image_id}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_localization_request(description, english_texts, model_name, image_url=image_url)
+            }
+            f.write(json_dumps_line(request))
+    
+    # A batch that cannot run aborts the run rather than writing placeholder rows
+    responses = await run_batch(requests_path)
+    
+    for g, ((image_id, indices), context) in enumerate(zip(row_groups, contexts)):
+        if context is None:
+            continue
+        english_texts = [rows[i]['en'].strip() for i in indices]
+        custom_id = f"{g}:{image_id}"
+        if custom_id not in responses:
+            results = error_localizations(english_texts, "Batch request failed")
+        else:
+            try:
+                results = parse_localization_response(responses[custom_id], english_texts, model_id)
+            except Exception as e:
+                print(f"✗ Error processing localization with model {model_id}: {str(e)}")
+                results = error_localizations(english_texts, str(e))
+        apply_localizations(indices, results, translations)
+    
+    return contexts
+
+def open_semicolon_csv(output_file, headers):
+    """Open a CSV file with semicolons as separators for writing and write its header row.
+
+    The file uses utf-8-sig so the BOM (Byte Order Mark) tells spreadsheet apps the
+    file is UTF-8, which keeps Turkish characters (ı, İ, ğ, ş, ...) intact. Fields
+    containing semicolons, quotes or newlines are quoted by the csv module.
+    """
+    file = open(output_file, 'w', encoding='utf-8-sig', newline='')
+    writer = csv.writer(file, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+    writer.writerow(headers)
+    return file, writer
+
+def write_semicolon_csv(rows, headers, output_file):
+    """Write rows to a CSV file with semicolons as separators using UTF-8 encoding"""
+    file, writer = open_semicolon_csv(output_file, headers)
+    with file:
+        writer.writerows([row.get(header, '') for header in headers] for row in rows)
     
     print(f"✓ Saved CSV results to {output_file} (UTF-8 encoded with BOM for Turkish character support)")
 
-def process_csv_file(data_file, imgs_dir, output_dir, debug=False, limit=None):
+def write_json_array(records, output_file):
+    """Write records to an indented JSON array file one record at a time.
+
+    The output matches serializing the whole list at once, without holding all
+    records or the full document in memory.
+    """
+    with open(output_file, 'wb') as f:
+        separator = b"[\n  "
+        for record in records:
+            f.write(separator)
+            f.write(json_dumps(record, indent=True).replace(b"\n", b"\n  "))
+            separator = b",\n  "
+        f.write(b"[]" if separator == b"[\n  " else b"\n]")
+
+async def process_csv_file(data_file, imgs_dir, output_dir, debug=False, limit=None,
+                           max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                           max_requests_per_minute=DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                           max_tokens_per_minute=DEFAULT_MAX_TOKENS_PER_MINUTE,
+                           cache_path=DEFAULT_DESCRIPTION_CACHE, batch=False):
     """Process CSV data file and create output for each model"""
     print(f"\n🚀 Starting CSV-based localization process with OpenAI client")
     
-    # Create a dictionary to cache image descriptions
+    # Create a dictionary to cache image description tasks
     descriptions_cache = {}
     
+    # Load descriptions persisted by earlier runs, keyed by image hash; debug runs
+    # only return mock descriptions, so they neither read nor write the cache
+    disk_cache = {} if debug else load_description_cache(cache_path)
+    
+    # Bound the number of in-flight API requests
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    # Throttle API requests to the configured rate limits
+    processor = APIRequestProcessor(max_requests_per_minute, max_tokens_per_minute)
+    processor_task = asyncio.create_task(processor.run())
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # Read the CSV file
     try:
-        headers, rows = read_semicolon_csv(data_file)
+        # Rows past the limit are never parsed
+        headers, rows = read_semicolon_csv(data_file, limit=limit if limit and limit > 0 else None)
         print(f"Loaded {len(rows)} rows from {data_file}")
         
         if debug:
@@ -464,84 +1055,248 @@ def process_csv_file(data_file, imgs_dir, output_dir, debug=False, limit=None):
         print(f"✗ Error reading CSV file: {str(e)}")
         return
     
+    # Index the image files once instead of listing the directory per row
+    image_index = build_image_index(imgs_dir)
+    
     # Check imgs directory
     if debug:
+        image_files = [os.path.basename(path) for path in dict.fromkeys(image_index.values())]
         print(f"\n🔍 DEBUGGING: Checking imgs directory: {imgs_dir}")
-        if os.path.exists(imgs_dir):
-            print(f"Directory exists. Contains {len(os.listdir(imgs_dir))} files.")
-            print(f"Sample files: {', '.join(os.listdir(imgs_dir)[:5])}")
-        else:
-            print(f"⚠️ Directory does not exist!")
+        print(f"Indexed {len(image_files)} image files.")
+        print(f"Sample files: {', '.join(image_files[:5])}")
     
     # Limit rows if specified
     if limit and limit > 0:
-        rows = rows[:limit]
         print(f"Processing only the first {limit} rows")
     
-    # Process with each model
-    for model_id, model_name in MODELS.items():
-        print(f"\n🌐 Processing with model: {model_id}")
+    # Group rows by image so texts sharing a description go out in one request
+    row_groups = []
+    indices_by_image = {}
+    for i, row in enumerate(rows):
+        image_id = row.get('image_id', '').strip() if row.get('image_id') else ''
+        english_text = row.get('en', '').strip() if row.get('en') else ''
         
-        # Create a copy of the rows for this model
-        model_rows = [row.copy() for row in rows]
+        # Skip rows without image_id or English text
+        if not image_id or not english_text:
+            print(f"\n⚠️ Skipping row with KEY={row.get('KEY', '')}: Missing image_id or English text")
+            continue
         
-        # Prepare output data structures
-        complete_data = []
+        indices = indices_by_image.get(image_id)
+        if indices is None or len(indices) >= MAX_TEXTS_PER_REQUEST:
+            indices = indices_by_image[image_id] = []
+            row_groups.append((image_id, indices))
+        indices.append(i)
+    grouped_indices = {i for image_id, indices in row_groups for i in indices}
+    
+    # Stage 1: describe each image once for the text-only models; the
+    # localization requests of every model are scheduled right after. A quarter
+    # of the concurrency limit keeps Vision calls from crowding out localization
+    if any(model_name in TEXT_ONLY_MODELS for model_name in MODELS.values()):
+        start_image_descriptions((image_id for image_id, indices in row_groups), image_index, descriptions_cache,
+                                 disk_cache, processor, max(1, max_concurrency // 4), debug=debug)
+    
+    print(f"\n🌐 Processing with models: {', '.join(MODELS)}")
+    
+    # Per-model output file prefix, localized columns by row index, and row group results
+    model_names_safe = {model_id: model_id.translate(SAFE_FILENAME_TABLE) for model_id in MODELS}
+    model_translations = {model_id: {} for model_id in MODELS}
+    model_contexts = {model_id: [None] * len(row_groups) for model_id in MODELS}
+    
+    # process_row_group with everything but the row group bound once per model
+    group_processors = {
+        model_id: partial(process_row_group, rows, translations=model_translations[model_id],
+                          image_index=image_index, descriptions_cache=descriptions_cache, disk_cache=disk_cache,
+                          model_id=model_id, model_name=model_name, processor=processor, debug=debug)
+        for model_id, model_name in MODELS.items()
+    }
+    
+    async def process_group_bounded(model_id, g):
+        image_id, indices = row_groups[g]
         
-        # Process each row
-        for i, row in enumerate(model_rows):
+        # Text-only models wait for their image description before taking a
+        # concurrency slot; errors surface when the description is read below
+        description_task = descriptions_cache.get(image_id)
+        if description_task is not None and MODELS[model_id] in TEXT_ONLY_MODELS:
+            await asyncio.wait({description_task})
+        
+        async with semaphore:
             try:
-                updated_row, description = process_row(row, imgs_dir, descriptions_cache, model_id, model_name, debug=debug)
+                return model_id, g, await group_processors[model_id](indices=indices, image_id=image_id)
+            except FATAL_API_ERRORS:
+                raise
+            except Exception as e:
+                print_status(f"✗ Error processing rows for image {image_id} with model {model_id}: "
+                             f"{type(e).__name__}: {str(e)}")
+                # Formatting a full traceback is slow, so only do it while debugging
+                if debug:
+                    import traceback
+                    traceback.print_exc()
+                return model_id, g, None
+    
+    def localized_row(model_id, i):
+        # Input columns are shared by all models; only the localized ones differ
+        return {**rows[i], **model_translations[model_id].get(i, {})}
+    
+    def model_json_records(model_id):
+        row_descriptions = {}
+        for (image_id, indices), context in zip(row_groups, model_contexts[model_id]):
+            if context is not None:
+                # Prefer the description made for the text-only models, which a
+                # multimodal group that started earlier may not have seen yet
+                description = context[1]
+                task = descriptions_cache.get(image_id)
+                if task is not None and task.done() and not task.cancelled() and task.exception() is None:
+                    description = task.result()
+                for i in indices:
+                    row_descriptions[i] = description
+        
+        translations = model_translations[model_id]
+        for i in range(len(rows)):
+            if i in row_descriptions:
+                # Read input and localized columns directly instead of merging them into a row copy
+                row = rows[i]
+                localized = translations.get(i, row)
                 
-                if updated_row and description:
-                    # Update the row with the processed data
-                    model_rows[i] = updated_row
-                    
-                    # Don't add description to CSV output, only for JSON
-                    
-                    # Get the image ID for the JSON record
-                    image_id = str(row.get('image_id', ''))
-                    
-                    # Create a complete data record for JSON output
-                    json_record = {
-                        'KEY': updated_row.get('KEY', ''),
-                        'LEVEL_ID': updated_row.get('LEVEL_ID', ''),
-                        'image_id': image_id,
-                        'en': updated_row.get('en', ''),
-                        'description': description,
-                        'localization': {
-                            'tr': updated_row.get('tr', ''),
-                            'fr': updated_row.get('fr', ''),
-                            'de': updated_row.get('de', '')
-                        }
+                # Create a complete data record for JSON output; don't add description to CSV output
+                yield {
+                    'KEY': row['KEY'],
+                    'LEVEL_ID': row['LEVEL_ID'],
+                    'image_id': row['image_id'],
+                    'en': row['en'],
+                    'description': row_descriptions[i],
+                    'localization': {
+                        'tr': localized.get('tr', row['tr']),
+                        'fr': localized.get('fr', row['fr']),
+                        'de': localized.get('de', row['de'])
                     }
-                    complete_data.append(json_record)
-                
-                # Add a small delay between API calls to avoid rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"✗ Error processing row {i}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                }
+    
+    async def write_model_json(model_id):
+        """Save the complete data JSON of one model, including image descriptions"""
+        # Wait for the Vision descriptions of this model's images so the output
+        # doesn't depend on which requests happened to finish first
+        description_tasks = {
+            descriptions_cache[image_id]
+            for (image_id, indices), context in zip(row_groups, model_contexts[model_id])
+            if context is not None and image_id in descriptions_cache
+        }
+        if description_tasks:
+            await asyncio.wait(description_tasks)
         
-        # Generate the model file name prefix
-        model_name_safe = model_id.replace('/', '_').replace(' ', '_').replace('-', '_').replace('.', '_')
+        json_path = os.path.join(output_dir, f"output_{model_names_safe[model_id]}.json")
+        write_json_array(model_json_records(model_id), json_path)
+        print_status(f"✓ Saved JSON output to {json_path}")
         
-        # Don't add description to CSV headers
+        # Checkpoint the description cache too, so a later crash or kill (which
+        # skips the save at the end of the run) keeps what was paid for so far
+        if not debug:
+            save_description_cache(disk_cache, cache_path)
+    
+    async def process_model_batch(model_id):
+        # Submit every localization request of this model as one batch job
+        model_name_safe = model_names_safe[model_id]
+        requests_path = os.path.join(output_dir, f"batch_requests_{model_name_safe}.jsonl")
+        model_contexts[model_id] = await process_row_groups_batch(row_groups, rows, model_translations[model_id],
+                                                                  image_index, descriptions_cache, disk_cache,
+                                                                  model_id, MODELS[model_id], processor,
+                                                                  requests_path, debug=debug)
         
         # Save the resulting CSV with UTF-8 encoding
-        output_csv_path = os.path.join(output_dir, f"output_{model_name_safe}.csv")
-        write_semicolon_csv(model_rows, headers, output_csv_path)
+        write_semicolon_csv((localized_row(model_id, i) for i in range(len(rows))), headers,
+                            os.path.join(output_dir, f"output_{model_name_safe}.csv"))
+        await write_model_json(model_id)
+    
+    # Tasks scheduled below; a fatal error cancels the ones still running
+    scheduled_tasks = []
+    
+    try:
+        if batch:
+            # The batch jobs of all models run side by side
+            scheduled_tasks.extend(asyncio.ensure_future(process_model_batch(model_id)) for model_id in MODELS)
+            await asyncio.gather(*scheduled_tasks)
+        else:
+            # Don't add description to CSV headers
+            csv_paths = {
+                model_id: os.path.join(output_dir, f"output_{model_names_safe[model_id]}.csv") for model_id in MODELS
+            }
+            
+            # Stream rows to each model's CSV as their group completes so progress survives a crash
+            with contextlib.ExitStack() as stack:
+                csv_outputs = {}
+                for model_id, output_csv_path in csv_paths.items():
+                    csv_file, csv_writer = open_semicolon_csv(output_csv_path, headers)
+                    stack.enter_context(csv_file)
+                    csv_outputs[model_id] = csv_file, csv_writer
+                    
+                    # Rows that are not localized are written unchanged up front
+                    csv_writer.writerows([row.get(header, '') for header in headers]
+                                         for i, row in enumerate(rows) if i not in grouped_indices)
+                
+                # Every (row group, model) pair is independent, so all of them share one bounded pool
+                tasks = [asyncio.ensure_future(process_group_bounded(model_id, g))
+                         for g in range(len(row_groups)) for model_id in MODELS]
+                scheduled_tasks.extend(tasks)
+                groups_left = dict.fromkeys(MODELS, len(row_groups))
+                # Without tqdm, report progress in at most 20 steps rather than per request
+                report_every = max(1, -(-len(tasks) // 20))
+                with (tqdm(total=len(tasks), desc="Localizing", unit="request") if tqdm
+                      else contextlib.nullcontext()) as progress:
+                    for done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                        model_id, g, context = await next_done
+                        if progress is not None:
+                            progress.update()
+                        elif done % report_every == 0 or done == len(tasks):
+                            print(f"  {done}/{len(tasks)} requests done")
+                        model_contexts[model_id][g] = context
+                        csv_file, csv_writer = csv_outputs[model_id]
+                        csv_writer.writerows([localized_row(model_id, i).get(header, '') for header in headers]
+                                             for i in row_groups[g][1])
+                        csv_file.flush()
+                        
+                        # A model's JSON output is complete as soon as its last group is done
+                        groups_left[model_id] -= 1
+                        if not groups_left[model_id]:
+                            await write_model_json(model_id)
+                
+                if not row_groups:
+                    for model_id in MODELS:
+                        await write_model_json(model_id)
+            
+            for output_csv_path in csv_paths.values():
+                print(f"✓ Saved CSV results to {output_csv_path} (UTF-8 encoded with BOM for Turkish character support)")
+    finally:
+        # After a fatal error, cancel and wait for everything still running so
+        # its exceptions are retrieved, the run ends with a single traceback and
+        # no request is left in flight when the client closes
+        pending = [*scheduled_tasks, *descriptions_cache.values(), processor_task]
+        for task in pending:
+            task.cancel()
+        pending.extend(processor.cancel_in_flight())
+        await asyncio.gather(*pending, return_exceptions=True)
         
-        # Save the complete data JSON including all fields
-        json_path = os.path.join(output_dir, f"output_{model_name_safe}.json")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(complete_data, f, ensure_ascii=False, indent=4)
-        print(f"✓ Saved JSON output to {json_path}")
+        # Persist new descriptions so later runs can skip the Vision call, even
+        # when this run is interrupted or stopped by a fatal API error
+        if not debug:
+            save_description_cache(disk_cache, cache_path)
     
+    if processor.status.num_rate_limit_errors:
+        print(f"⚠️ {processor.status.num_rate_limit_errors} requests were rate limited and retried")
     print("\n✅ Processing completed successfully")
 
+def positive_int(value):
+    """argparse type for an integer greater than zero"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+def positive_float(value):
+    """argparse type for a number greater than zero"""
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description='OpenAI Client Processor for Game Localization')
     parser.add_argument('--data', required=True, help='Path to the data.csv file (semicolon-separated)')
@@ -549,6 +1304,17 @@ def main():
     parser.add_argument('--output', required=True, help='Directory to save output CSV files')
     parser.add_argument('--debug', action='store_true', help='Run in debug mode (no API calls, mock responses)')
     parser.add_argument('--limit', type=int, help='Limit number of rows to process')
+    parser.add_argument('--concurrency', type=positive_int, default=DEFAULT_MAX_CONCURRENCY,
+                        help='Maximum number of concurrent API requests')
+    parser.add_argument('--batch', action='store_true',
+                        help='Submit localization requests through the Batch API (cheaper, up to 24h turnaround; '
+                             'needs OPENAI_BASE_URL set to an endpoint with the Batch API, such as OpenAI)')
+    parser.add_argument('--cache', default=DEFAULT_DESCRIPTION_CACHE,
+                        help='Path to the on-disk image description cache')
+    parser.add_argument('--max-rpm', type=positive_float, default=DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                        help='Maximum API requests per minute')
+    parser.add_argument('--max-tpm', type=positive_float, default=DEFAULT_MAX_TOKENS_PER_MINUTE,
+                        help='Maximum API tokens per minute')
     args = parser.parse_args()
     
     # Validate paths
@@ -560,8 +1326,24 @@ def main():
         print(f"Error: Images directory {args.imgs} does not exist")
         return
     
+    # Debug runs skip the Batch API, so only real batch runs need an endpoint that has it
+    if args.batch and not args.debug and USES_OPENROUTER:
+        print("Error: --batch needs the Batch API, which OpenRouter does not provide. Set OPENAI_BASE_URL "
+              "(and OPENAI_API_KEY) to an endpoint that supports it")
+        return
+    
+    async def run():
+        try:
+            await process_csv_file(args.data, args.imgs, args.output, debug=args.debug, limit=args.limit,
+                                   max_concurrency=args.concurrency, max_requests_per_minute=args.max_rpm,
+                                   max_tokens_per_minute=args.max_tpm, cache_path=args.cache,
+                                   batch=args.batch)
+        finally:
+            # Close pooled connections while the event loop is still running
+            await client.close()
+    
     # Process the CSV file
-    process_csv_file(args.data, args.imgs, args.output, debug=args.debug, limit=args.limit)
+    asyncio.run(run())
 
 if __name__ == "__main__":
     main()